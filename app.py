@@ -1,10 +1,10 @@
 # app.py（本体）
 import streamlit as st
-from modules.data_loader import load_data, filter_data, prepare_ai_input
+from modules.data_loader import load_data, filter_data, prepare_ai_input, partition_ai_input, prepare_price_trend, prepare_price_series
 from modules.graph import set_fonts,draw_graph
-from modules.gemini import create_prompt, generate_summary
+from modules.gemini import create_prompt, generate_summary, generate_summary_map_reduce
 from modules.pdf import create_advanced_pdf
-from config.settings import COUNTRIES, FOCUS_OPTIONS
+from config.settings import COUNTRIES, FOCUS_OPTIONS, CURRENCIES
 
 
 # UI設定
@@ -16,6 +16,7 @@ def main():
     with st.sidebar:
         countries = st.multiselect("対象国を選択", options=COUNTRIES, default=["jp"])
         focus = st.selectbox("分析の切り口を選択", options=FOCUS_OPTIONS)
+        currency = st.selectbox("表示通貨", options=CURRENCIES)
         user_query = st.text_input("AIに追加で聞きたいこと（任意）", placeholder="例：なぜこの傾向があるの？")
         button = st.button("🧠 レポートを生成")
 
@@ -29,7 +30,7 @@ def main():
 
     if button:
         with st.spinner("データを準備中..."):
-            raw_df = load_data()
+            raw_df = load_data(currency)
             filtered_df = filter_data(raw_df, countries)
             
             if filtered_df.empty:
@@ -38,11 +39,23 @@ def main():
                 df_subset = prepare_ai_input(filtered_df, focus)
                 
                 # グラフを作成
-                fig = draw_graph(df_subset, focus)
+                fig = draw_graph(df_subset, focus, currency)
                 
-                # プロンプト作成とAI分析
-                prompt = create_prompt(df_subset, countries, focus, user_query)
-                report_text = generate_summary(prompt)
+                # 価格分析では価格履歴の傾向も渡す
+                price_trend = prepare_price_trend(countries) if focus == "価格" else None
+                price_series = prepare_price_series(countries, currency) if focus == "価格" else None
+
+                # プロンプト作成とAI分析（複数国は国ごとに要約してから統合）
+                if len(countries) > 1:
+                    partitions = partition_ai_input(filtered_df, focus)
+                    report_text, prompt = generate_summary_map_reduce(
+                        partitions, countries, focus, user_query, price_trend, currency,
+                        price_series=price_series
+                    )
+                else:
+                    prompt = create_prompt(df_subset, countries, focus, user_query, price_trend, currency,
+                                           price_series=price_series)
+                    report_text = generate_summary(prompt)
                 
                 # セッション状態に保存
                 st.session_state.report_text = report_text
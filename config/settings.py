@@ -10,9 +10,44 @@ FOCUS_OPTIONS = [
     "プラットフォーム"
 ]
 
+# 為替レートの初期値（exchange_rates テーブル未作成時にも使う）
 EXCHANGE_RATES = {
     "jp": 1.0,
     "us": 150.0,   # $1 ≒ ¥150
     "de": 160.0,   # €1 ≒ ¥160
     "kr": 0.11     # ₩1 ≒ ¥0.11
-}
\ No newline at end of file
+}
+
+# 国コードごとの通貨
+COUNTRY_CURRENCIES = {
+    "jp": "JPY",
+    "us": "USD",
+    "de": "EUR",
+    "kr": "KRW"
+}
+
+# レポートで選べる表示通貨
+CURRENCIES = ["JPY", "USD", "EUR", "KRW"]
+
+# 複数国の要約を並列で行うときの同時実行数
+MAX_SUMMARY_WORKERS = 4
+
+# 価格帯の円グラフで使う通貨ごとの区切りとラベル（最後の区切り以上は「〜」でまとめる）
+PRICE_BANDS = {
+    "JPY": {
+        "bins": [0, 500, 1000, 2000, 4000, 8000],
+        "labels": ["〜500円", "501〜1000円", "1001〜2000円", "2001〜4000円", "4001〜8000円", "8001円〜"]
+    },
+    "USD": {
+        "bins": [0, 5, 10, 20, 40, 60],
+        "labels": ["〜$5", "$5〜10", "$10〜20", "$20〜40", "$40〜60", "$60〜"]
+    },
+    "EUR": {
+        "bins": [0, 5, 10, 20, 40, 60],
+        "labels": ["〜€5", "€5〜10", "€10〜20", "€20〜40", "€40〜60", "€60〜"]
+    },
+    "KRW": {
+        "bins": [0, 5000, 10000, 20000, 40000, 80000],
+        "labels": ["〜₩5000", "₩5000〜10000", "₩10000〜20000", "₩20000〜40000", "₩40000〜80000", "₩80000〜"]
+    }
+}
@@ -0,0 +1,45 @@
+import os
+import sqlite3
+from datetime import date
+from config.settings import EXCHANGE_RATES, COUNTRY_CURRENCIES
+
+
+# 為替レートテーブルを作成（1通貨あたりの円換算レートを日付つきで保持）
+def ensure_exchange_rate_table(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS exchange_rates (
+            currency TEXT NOT NULL,
+            valid_from TEXT NOT NULL,
+            rate_to_jpy REAL NOT NULL,
+            PRIMARY KEY (currency, valid_from)
+        )
+    """)
+    conn.commit()
+
+
+# レートを保存（同じ通貨・日付があれば上書き）
+# rates は {通貨: 1通貨あたりの円} の辞書
+def save_exchange_rates(conn, rates, valid_from=None):
+    ensure_exchange_rate_table(conn)
+    valid_from = str(valid_from or date.today())
+    rows = [(currency, valid_from, rate) for currency, rate in rates.items()]
+    conn.executemany(
+        "INSERT OR REPLACE INTO exchange_rates (currency, valid_from, rate_to_jpy) VALUES (?, ?, ?)",
+        rows
+    )
+    conn.commit()
+    return len(rows)
+
+
+# settings.py の国別レートを通貨別に読み替える
+def default_rates():
+    return {COUNTRY_CURRENCIES[c]: rate for c, rate in EXCHANGE_RATES.items()}
+
+
+if __name__ == "__main__":
+    db_path = "data/steam_games.db"
+    os.makedirs("data", exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    count = save_exchange_rates(conn, default_rates())
+    conn.close()
+    print(f"✅ {count} 通貨の為替レートを保存しました。")
@@ -0,0 +1,73 @@
+import pandas as pd
+
+
+HISTORY_COLUMNS = ["appid", "country", "recorded_at", "price", "initial_price", "discount_percent"]
+
+
+# 価格履歴テーブルとインデックスを作成（追記専用）
+def ensure_price_history_table(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS price_history (
+            appid TEXT NOT NULL,
+            country TEXT NOT NULL,
+            recorded_at TEXT NOT NULL,
+            price REAL,
+            initial_price REAL,
+            discount_percent INTEGER
+        )
+    """)
+    # (appid, country) ごとの期間検索用
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_price_history_key_time
+        ON price_history (appid, country, recorded_at)
+    """)
+    # 国・期間での横断検索用
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_price_history_country_time
+        ON price_history (country, recorded_at)
+    """)
+    conn.commit()
+
+
+# (appid, country) ごとの最新の記録を取得
+def load_latest_prices(conn):
+    return pd.read_sql_query("""
+        SELECT h.appid, h.country, h.recorded_at, h.price, h.initial_price, h.discount_percent
+        FROM price_history h
+        JOIN (
+            SELECT appid, country, MAX(recorded_at) AS recorded_at
+            FROM price_history
+            GROUP BY appid, country
+        ) latest
+        ON h.appid = latest.appid
+        AND h.country = latest.country
+        AND h.recorded_at = latest.recorded_at
+    """, conn)
+
+
+# 価格が前回から変わった行だけを追記する（差分記録）
+# df は HISTORY_COLUMNS を含む前提
+def record_price_changes(df, conn):
+    ensure_price_history_table(conn)
+
+    snapshot = df[HISTORY_COLUMNS].copy()
+    snapshot["appid"] = snapshot["appid"].astype(str)
+    # 同じキーが複数あれば最新の取得分のみ残す
+    snapshot = snapshot.sort_values("recorded_at").drop_duplicates(["appid", "country"], keep="last")
+
+    latest = load_latest_prices(conn)
+    merged = snapshot.merge(latest, on=["appid", "country"], how="left", suffixes=("", "_prev"), indicator=True)
+
+    is_new = merged["_merge"] == "left_only"
+    # 既に記録済みの時刻より古い取得分は無視する
+    is_newer = merged["recorded_at"] > merged["recorded_at_prev"]
+    is_changed = (
+        (merged["price"] != merged["price_prev"])
+        | (merged["initial_price"] != merged["initial_price_prev"])
+        | (merged["discount_percent"] != merged["discount_percent_prev"])
+    )
+    changes = merged.loc[is_new | (is_newer & is_changed), HISTORY_COLUMNS]
+
+    if not changes.empty:
+        changes.to_sql("price_history", conn, if_exists="append", index=False)
+    return len(changes)
@@ -2,7 +2,8 @@ import os
 import json
 import pandas as pd
 import sqlite3
-from config.settings import EXCHANGE_RATES
+from datetime import datetime
+from init_data.price_history import record_price_changes
 
 
 
@@ -10,13 +11,15 @@ from config.settings import EXCHANGE_RATES
 def extract_info(appid, data, country_code):
     try:
         app_data = data[str(appid)]['data']
-        price = app_data.get('price_overview', {}).get('final', 0) / 100
+        price_overview = app_data.get('price_overview', {})
+        price = price_overview.get('final', 0) / 100
         
         return {
             'appid': appid,
             'name': app_data.get('name'),
             'price': price,
-            'price_jpy': convert_to_jpy(price,country_code),
+            'initial_price': price_overview.get('initial', 0) / 100,
+            'discount_percent': price_overview.get('discount_percent', 0),
             'genres': ', '.join([g['description'] for g in app_data.get('genres', [])]),
             'release_date': app_data.get('release_date', {}).get('date'),
             'recommendations': app_data.get('recommendations', {}).get('total', 0),
@@ -30,12 +33,6 @@ def extract_info(appid, data, country_code):
     except:
         return None
     
-#日本円を計算する関数
-def convert_to_jpy(price, country_code):
-    rate = EXCHANGE_RATES.get(country_code, 1.0)
-    return round(price * rate)
-
-
 # JSONファイルから整形してSQLiteに保存
 # ファイル名が appid_国コード.json の形式である前提
 def transform_all_to_sqlite(json_folder, conn):
@@ -46,14 +43,24 @@ def transform_all_to_sqlite(json_folder, conn):
             parts = filename.replace(".json", "").split("_")
             appid = parts[0]
             country = parts[1] if len(parts) > 1 else "unknown"
-            with open(os.path.join(json_folder, filename), encoding="utf-8") as f:
+            filepath = os.path.join(json_folder, filename)
+            with open(filepath, encoding="utf-8") as f:
                 data = json.load(f)
                 record = extract_info(appid, data, country)
                 if record:
+                    # 取得日時はファイルの更新日時を使う
+                    record['recorded_at'] = datetime.fromtimestamp(os.path.getmtime(filepath)).strftime("%Y-%m-%d %H:%M:%S")
                     records.append(record)
 
     if records:
         df = pd.DataFrame(records)
+
+        # 価格が変わった分だけ履歴に追記
+        changed = record_price_changes(df, conn)
+        print(f"✅ {changed} 件の価格変動を履歴に記録しました。")
+
+        # games テーブルは最新値のみ（従来の列構成）
+        df = df.drop(columns=['initial_price', 'discount_percent', 'recorded_at'])
         df.to_sql("games", conn, if_exists='replace', index=False)
         print(f"✅ {len(records)} 件のデータをDBに保存しました。")
 
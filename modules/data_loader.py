@@ -1,14 +1,75 @@
 import sqlite3
+import hashlib
+from datetime import date
 import pandas as pd
 import streamlit as st
+from config.settings import COUNTRY_CURRENCIES
+from init_data.exchange_rates import default_rates
+from init_data.price_history import HISTORY_COLUMNS
 
 @st.cache_data(ttl=0)
-def load_data():
+def load_games():
     conn = sqlite3.connect("data/steam_games.db")
     df = pd.read_sql_query("SELECT * FROM games", conn)
     conn.close()
     return df
 
+# 価格は現地通貨のまま保存されているので、読み込み時に選択した通貨へ換算する
+# グラフや集計は換算後の price_converted 列を使う
+def load_data(currency="JPY"):
+    df = load_games().drop(columns=["price_jpy"], errors="ignore")
+    df["price_converted"] = convert_prices(df, currency, rate_version=get_rate_version())
+    return df
+
+# 為替レートの版。全行の内容から作るので、追加・上書きがあれば必ず変わる（キャッシュのキーに使う）
+def get_rate_version():
+    conn = sqlite3.connect("data/steam_games.db")
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='exchange_rates'"
+    ).fetchone()
+    if not exists:
+        conn.close()
+        return "settings"
+    (rows,) = conn.execute("""
+        SELECT GROUP_CONCAT(currency || ':' || valid_from || ':' || rate_to_jpy, ',')
+        FROM (SELECT * FROM exchange_rates ORDER BY currency, valid_from)
+    """).fetchone()
+    conn.close()
+    return hashlib.sha1((rows or "").encode("utf-8")).hexdigest()
+
+# 日付つきの為替レート（テーブルが無ければ空。足りない分は settings.py の値で補う）
+@st.cache_data
+def load_exchange_rates(rate_version):
+    if rate_version == "settings":
+        return pd.DataFrame(columns=["currency", "valid_from", "rate_to_jpy"])
+    conn = sqlite3.connect("data/steam_games.db")
+    df = pd.read_sql_query("SELECT currency, valid_from, rate_to_jpy FROM exchange_rates", conn)
+    conn.close()
+    return df
+
+# 国コードごとの「現地通貨 → 指定通貨」の換算係数（as_of 時点で有効なレートを使う）
+@st.cache_data
+def get_conversion_factors(currency, rate_version, as_of=None):
+    rates = load_exchange_rates(rate_version)
+    if as_of:
+        rates = rates[rates["valid_from"] <= str(as_of)]
+    to_jpy = rates.sort_values("valid_from").groupby("currency")["rate_to_jpy"].last()
+
+    # テーブルに無い通貨（as_of 以前のレートが無い場合も）は settings.py の値を使う
+    to_jpy = to_jpy.combine_first(pd.Series(default_rates())).astype(float)
+    if currency not in to_jpy:
+        raise ValueError(f"為替レートが見つかりません: {currency}")
+
+    country_to_jpy = pd.Series(COUNTRY_CURRENCIES).map(to_jpy)
+    return country_to_jpy / to_jpy[currency]
+
+# price 列（現地通貨）を指定通貨に一括換算する
+# as_of を省略すると今日時点で有効なレートを使う。未知の国コードは従来どおり円とみなす
+def convert_prices(df, currency="JPY", as_of=None, rate_version=None):
+    as_of = str(as_of or date.today())
+    factors = get_conversion_factors(currency, rate_version or get_rate_version(), as_of)
+    return (df["price"] * df["country"].map(factors).fillna(factors["jp"])).round(2)
+
 def filter_data(df, countries):
     return df[df["country"].isin(countries)].copy()
 
@@ -16,13 +77,13 @@ def prepare_ai_input(df, focus):
     if focus == "年齢制限":
         return df.groupby("required_age").agg(
             ゲーム数=("appid", "count"),
-            平均価格=("price", "mean"),
+            平均価格=("price_converted", "mean"),
             平均レビュー数=("recommendations", "mean")
         ).reset_index()
     elif focus == "無料かどうか":
         return df.groupby("is_free").agg(
             ゲーム数=("appid", "count"),
-            平均価格=("price", "mean"),
+            平均価格=("price_converted", "mean"),
             平均レビュー数=("recommendations", "mean")
         ).reset_index()
     elif focus == "プラットフォーム":
@@ -38,4 +99,123 @@ def prepare_ai_input(df, focus):
         df["year"] = pd.to_datetime(df["release_date"], errors="coerce").dt.year
         return df.dropna(subset=["year"])
     else:
-        return df.head(50)
\ No newline at end of file
+        return df.head(50)
+
+# 国（または任意の列のセグメント）ごとに分けて、それぞれ prepare_ai_input を適用
+def partition_ai_input(df, focus, by="country"):
+    return {
+        key: prepare_ai_input(group.copy(), focus)
+        for key, group in df.groupby(by, sort=True)
+    }
+
+
+# 価格履歴を期間・国・AppIDで絞り込んで取得（インデックスを使う範囲検索）
+@st.cache_data(ttl=0)
+def load_price_history(countries=None, appids=None, start=None, end=None):
+    conn = sqlite3.connect("data/steam_games.db")
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='price_history'"
+    ).fetchone()
+    if not exists:
+        conn.close()
+        return pd.DataFrame(columns=HISTORY_COLUMNS)
+
+    conditions = []
+    params = []
+    if countries:
+        conditions.append(f"country IN ({', '.join('?' * len(countries))})")
+        params += list(countries)
+    if appids:
+        conditions.append(f"appid IN ({', '.join('?' * len(appids))})")
+        params += [str(a) for a in appids]
+    if start:
+        conditions.append("recorded_at >= ?")
+        params.append(str(start))
+    if end:
+        conditions.append("recorded_at <= ?")
+        params.append(str(end))
+
+    query = f"SELECT {', '.join(HISTORY_COLUMNS)} FROM price_history"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY appid, country, recorded_at"
+
+    df = pd.read_sql_query(query, conn, params=params)
+    conn.close()
+    return df
+
+# 変動点だけの履歴から (appid, country) ごとの価格推移を作る
+# 列が (appid, country)、行が期間（開始日）の表を返す（変動のない期間は直前の価格で埋める）
+# 全タイトル×期間の表になるので、既定は月単位。start/end で期間を絞れる
+def build_price_series(history, freq="M", value="price", start=None, end=None):
+    if history.empty:
+        return pd.DataFrame()
+
+    df = history.copy()
+    df["period"] = pd.to_datetime(df["recorded_at"]).dt.to_period(freq).dt.start_time
+    series = df.pivot_table(index="period", columns=["appid", "country"], values=value, aggfunc="last")
+
+    first = pd.Timestamp(start).to_period(freq).start_time if start else series.index.min()
+    last = pd.Timestamp(end).to_period(freq).start_time if end else series.index.max()
+    full_index = pd.period_range(first, last, freq=freq).start_time
+    # start より前の変動も引き継ぐため、埋めてから期間で切り出す
+    series = series.reindex(series.index.union(full_index)).ffill()
+    return series.loc[full_index]
+
+# (appid, country) ごとの価格変更回数・セール回数・最大割引率
+def discount_frequency(history):
+    if history.empty:
+        return pd.DataFrame(columns=["appid", "country", "価格変更回数", "セール回数", "最大割引率"])
+
+    df = history.sort_values(["appid", "country", "recorded_at"])
+    on_sale = df["discount_percent"] > 0
+    # 直前の記録がセール中でなければセール開始とみなす
+    was_on_sale = on_sale.groupby([df["appid"], df["country"]]).shift(fill_value=False)
+    df = df.assign(sale_start=on_sale & ~was_on_sale)
+
+    return df.groupby(["appid", "country"]).agg(
+        価格変更回数=("recorded_at", lambda s: len(s) - 1),
+        セール回数=("sale_start", "sum"),
+        最大割引率=("discount_percent", "max")
+    ).reset_index()
+
+# 「価格」分析用に国ごとの価格推移・セール傾向をまとめる
+def prepare_price_trend(countries):
+    history = load_price_history(countries=countries)
+    if history.empty:
+        return pd.DataFrame()
+
+    freq = discount_frequency(history)
+    period = history.groupby("country")["recorded_at"].agg(["min", "max"])
+    trend = freq.groupby("country").agg(
+        タイトル数=("appid", "count"),
+        価格変更回数=("価格変更回数", "sum"),
+        セール回数=("セール回数", "sum"),
+        平均最大割引率=("最大割引率", "mean")
+    )
+
+    # 記録開始時点から最新までの価格変動率（無料タイトルは除外）
+    # 履歴は (appid, country, recorded_at) 順なので first/last がそれぞれ最初と最新の価格
+    prices = history.groupby(["appid", "country"])["price"].agg(["first", "last"])
+    prices = prices[prices["first"] > 0]
+    change = (prices["last"] / prices["first"] - 1) * 100
+    trend["平均価格変動率(%)"] = change.groupby(level="country").mean().round(1)
+
+    trend["初回記録"] = period["min"]
+    trend["最終変動"] = period["max"]
+    return trend.reset_index()
+
+# 「価格」分析用に国ごとの価格（中央値）の推移を作る（currency 換算、無料タイトルは除外）
+# 直近 months か月分のみ（それ以前の変動は開始時点の価格として引き継ぐ）
+def prepare_price_series(countries, currency="JPY", freq="M", months=12):
+    history = load_price_history(countries=countries)
+    if history.empty:
+        return pd.DataFrame()
+
+    history = history.assign(price=convert_prices(history, currency))
+    start = pd.Timestamp(date.today()) - pd.DateOffset(months=months - 1)
+    series = build_price_series(history, freq=freq, start=start, end=date.today())
+    series = series.where(series > 0)
+    median = series.T.groupby(level="country").median().T.round(2)
+    median.index = median.index.strftime("%Y-%m-%d")
+    return median.rename_axis(index="期間", columns=None).reset_index()
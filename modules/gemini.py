@@ -1,25 +1,45 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from types import SimpleNamespace
 import google.generativeai as genai
 import streamlit as st
+from config.settings import MAX_SUMMARY_WORKERS
 
 
-# Geminiの初期化
-genai.configure(api_key=st.secrets["GEMINI_API_KEY"])
-model = genai.GenerativeModel("gemini-2.0-flash")
+# テスト用のローカルモデル（APIを呼ばずに固定形式の要約を返す）
+class StubModel:
+    model_name = "stub"
 
+    def generate_content(self, prompt):
+        first_line = next((line.strip() for line in prompt.splitlines() if line.strip()), "")
+        return SimpleNamespace(text=f"[stub] {first_line}（{len(prompt)}文字）")
 
-def create_prompt(df, countries, focus, custom_query):
+
+# Geminiの初期化（環境変数 GEMINI_STUB=1 ならスタブを使う）
+@lru_cache(maxsize=1)
+def get_model():
+    if os.environ.get("GEMINI_STUB") == "1":
+        return StubModel()
+    genai.configure(api_key=st.secrets["GEMINI_API_KEY"])
+    return genai.GenerativeModel("gemini-2.0-flash")
+
+
+# compare_countries=False のときは他国比較の指示を省く（map-reduce の国別プロンプト用）
+def create_prompt(df, countries, focus, custom_query, price_trend=None, currency="JPY", compare_countries=True,
+                  price_series=None):
     country_names = ", ".join(countries)
+    compare_line = "\n- 他国との比較や仮説（可能なら）" if compare_countries else ""
     
     base_text = f"""
 以下は {country_names} のSteamゲームデータに基づき、「{focus}」を分析するための情報です。
-（使用データ件数: {len(df)}件）
+（使用データ件数: {len(df)}件、価格は {currency} 換算）
 
 {df.to_string(index=False)}
-
+{_format_price_trend(price_trend, price_series)}
 このデータをもとに以下を自然な日本語で分析してください：
 - 傾向や相関関係
-- 興味深いパターンや異常値
-- 他国との比較や仮説（可能なら）
+- 興味深いパターンや異常値{compare_line}
 
 
 {custom_query or "気づいたことを自由に述べてください。"}
@@ -30,10 +50,73 @@ def create_prompt(df, countries, focus, custom_query):
     return base_text
 
 
-def generate_summary(prompt):
-    response = model.generate_content(prompt)
+# 価格履歴の集計・推移があればプロンプトに追加する
+def _format_price_trend(price_trend, price_series=None):
+    text = ""
+    if price_trend is not None and not price_trend.empty:
+        text += f"""
+【価格履歴（国別の価格変動・セール傾向）】
+{price_trend.to_string(index=False)}
+"""
+    if price_series is not None and not price_series.empty:
+        text += f"""
+【国別の価格中央値の推移】
+{price_series.to_string(index=False)}
+"""
+    return text
+
+
+# 国ごとの部分要約をまとめるためのプロンプト
+def create_reduce_prompt(partials, countries, focus, custom_query, price_trend=None, price_series=None,
+                         currency="JPY"):
+    country_names = ", ".join(countries)
+    sections = "\n\n".join(f"【{key}】\n{text}" for key, text in partials.items())
+
+    return f"""
+以下は {country_names} のSteamゲームデータについて、「{focus}」を国ごとに分析した要約です。
+（価格は {currency} 換算）
+
+{sections}
+{_format_price_trend(price_trend, price_series)}
+これらの要約を統合し、以下を自然な日本語でまとめてください：
+- 全体の傾向と国ごとの違い
+- 興味深いパターンや異常値
+- 国ごとの違いについての仮説
+
+
+{custom_query or "気づいたことを自由に述べてください。"}
+"""
+
+
+def generate_summary(prompt, model=None):
+    response = (model or get_model()).generate_content(prompt)
     return response.text
 
 
+# 部分要約はプロンプトとモデルごとにキャッシュ（1か国だけ変えた場合は他の国を再利用）
+@lru_cache(maxsize=256)
+def _summarize_partition(prompt, model):
+    return generate_summary(prompt, model)
+
+
+# 国ごとに並列で要約（map）し、最後にまとめて要約（reduce）する
+# partitions は partition_ai_input の戻り値。(要約, 最終プロンプト) を返す
+def generate_summary_map_reduce(partitions, countries, focus, custom_query,
+                                price_trend=None, currency="JPY", model=None, max_workers=MAX_SUMMARY_WORKERS,
+                                price_series=None):
+    model = model or get_model()
+    prompts = {
+        key: create_prompt(part, [str(key)], focus, custom_query, currency=currency, compare_countries=False)
+        for key, part in partitions.items()
+    }
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(prompts)))) as pool:
+        futures = {key: pool.submit(_summarize_partition, prompt, model) for key, prompt in prompts.items()}
+        partials = {key: future.result() for key, future in futures.items()}
+
+    reduce_prompt = create_reduce_prompt(partials, countries, focus, custom_query, price_trend, price_series, currency)
+    return generate_summary(reduce_prompt, model), reduce_prompt
+
+
 
 
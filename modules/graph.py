@@ -2,6 +2,7 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 from matplotlib import pyplot as plt, font_manager as fm
 from modules.util.plot_price_graph import plot_price_pie
+from modules.util.histogram import compute_histogram, histogram_from_counts, draw_histogram, draw_count_bars
 
  # フォントの設定
 def set_fonts():
@@ -11,21 +12,31 @@ def set_fonts():
     plt.rcParams["font.family"] = "IPAexGothic"
 
 
-def draw_graph(df, focus):
+def draw_graph(df, focus, currency="JPY"):
 
     if focus == "価格":
-        fig = plot_price_pie(df)
+        fig = plot_price_pie(df, currency)
     else:
         fig, ax = plt.subplots(figsize=(10, 6))
         
+        # ヒストグラムは NumPy でビン集計してから描画する
         if focus == "レビュー数":
-            sns.histplot(df[df["recommendations"] > 0], x="recommendations", bins=30, ax=ax)
+            counts, edges = compute_histogram(df["recommendations"], bins=30, log=True)
+            draw_histogram(ax, counts, edges, log=True)
+            ax.set_xlabel("recommendations（対数スケール）")
             ax.set_title(f"レビュー数分布（{len(df)}件）")
         elif focus == "リリース年":
-            sns.histplot(df["year"].dropna(), bins=20, ax=ax)
+            # 年ごとの件数に集計してからビンにまとめる
+            year_counts = df["year"].value_counts()
+            counts, edges = histogram_from_counts(year_counts.index, year_counts.values, bins=20)
+            draw_histogram(ax, counts, edges)
+            ax.set_xlabel("year")
             ax.set_title(f"リリース年の分布（{len(df)}件）")
         elif focus == "無料かどうか":
-            sns.countplot(data=df, x="is_free", ax=ax)
+            # prepare_ai_input で集計済みのゲーム数をそのまま使う
+            labels = df["is_free"].map({0: "有料", 1: "無料"})
+            draw_count_bars(ax, labels, df["ゲーム数"])
+            ax.set_xlabel("is_free")
             ax.set_title(f"無料/有料の分布（{len(df)}件）")
         elif focus == "年齢制限":
             sns.barplot(data=df, x="required_age", y="ゲーム数", ax=ax)
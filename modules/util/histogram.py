@@ -0,0 +1,72 @@
+import numpy as np
+
+
+# ビン境界を作成（log=True なら対数スケールで等間隔）
+def _make_edges(values, bins, log):
+    low, high = values.min(), values.max()
+    if low == high:
+        high = low * 10 if log else low + 1
+    if log:
+        return np.geomspace(low, high, bins + 1)
+    return np.linspace(low, high, bins + 1)
+
+
+# 値の配列からヒストグラム（件数とビン境界）を計算
+# log=True のときは正の値だけを数える
+def compute_histogram(values, bins=30, log=False):
+    values = np.asarray(values, dtype=float)
+    values = values[np.isfinite(values)]
+    if log:
+        values = values[values > 0]
+    if len(values) == 0:
+        return np.zeros(0, dtype=int), np.zeros(0)
+
+    return np.histogram(values, bins=_make_edges(values, bins, log))
+
+
+# 集計済みの値と件数からヒストグラムを作る（行データを展開せずに済む）
+def histogram_from_counts(values, counts, bins=30, log=False):
+    values = np.asarray(values, dtype=float)
+    counts = np.asarray(counts, dtype=float)
+    mask = np.isfinite(values)
+    if log:
+        mask &= values > 0
+    values, counts = values[mask], counts[mask]
+    if len(values) == 0:
+        return np.zeros(0, dtype=int), np.zeros(0)
+
+    hist, edges = np.histogram(values, bins=_make_edges(values, bins, log), weights=counts)
+    return hist.astype(int), edges
+
+
+# 境界を指定してビンごとの件数を数える
+# right=True なら pd.cut と同じ (a, b] 区間、範囲外の値は数えない
+def bin_counts(values, edges, right=True):
+    values = np.asarray(values, dtype=float)
+    edges = np.asarray(edges, dtype=float)
+    values = values[~np.isnan(values)]
+    side = "left" if right else "right"
+    idx = np.searchsorted(edges, values, side=side) - 1
+    valid = (idx >= 0) & (idx < len(edges) - 1)
+    return np.bincount(idx[valid], minlength=len(edges) - 1)
+
+
+# ビン済みのヒストグラムを描画（行数ではなくビン数に比例するコスト）
+def draw_histogram(ax, counts, edges, log=False, color="steelblue"):
+    if len(counts) == 0:
+        ax.text(0.5, 0.5, "データがありません", ha='center', va='center', transform=ax.transAxes)
+        return ax
+    ax.bar(edges[:-1], counts, width=np.diff(edges), align="edge", color=color, edgecolor="white")
+    if log:
+        ax.set_xscale("log")
+    ax.set_xlim(edges[0], edges[-1])
+    ax.set_ylim(bottom=0)
+    ax.set_ylabel("件数")
+    return ax
+
+
+# カテゴリごとの件数（集計済み）を棒グラフで描画
+def draw_count_bars(ax, labels, counts, color="steelblue"):
+    ax.bar([str(label) for label in labels], counts, color=color)
+    ax.set_ylabel("件数")
+    return ax
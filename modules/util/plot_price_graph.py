@@ -3,24 +3,26 @@
 import matplotlib.pyplot as plt
 from matplotlib import pyplot as plt
 import pandas as pd
+from modules.util.histogram import bin_counts
+from config.settings import PRICE_BANDS
 
-def plot_price_pie(df):
-    """価格の円グラフ（無料 vs 有料、有料内価格帯）"""
+def plot_price_pie(df, currency="JPY"):
+    """価格の円グラフ（無料 vs 有料、有料内価格帯）。価格は price_converted（currency 換算）を使う"""
     plt.close('all')  # 既存の図をクリア
     fig, axes = plt.subplots(1, 2, figsize=(12, 5))
     
     # デバッグ用: データの確認
     #print(f"データフレームの形状: {df.shape}")
-    #print(f"price_jpy列の存在確認: {'price_jpy' in df.columns}")
-    #if 'price_jpy' in df.columns:
-        #print(f"価格データのサンプル: {df['price_jpy'].head()}")
-        #print(f"価格データの統計: {df['price_jpy'].describe()}")
+    #print(f"price_converted列の存在確認: {'price_converted' in df.columns}")
+    #if 'price_converted' in df.columns:
+        #print(f"価格データのサンプル: {df['price_converted'].head()}")
+        #print(f"価格データの統計: {df['price_converted'].describe()}")
     
     try:
         
         # 全体の無料・有料構成
-        free_count = (df["price_jpy"] == 0).sum()
-        paid_count = (df["price_jpy"] > 0).sum()
+        free_count = (df["price_converted"] == 0).sum()
+        paid_count = (df["price_converted"] > 0).sum()
         total_count = free_count + paid_count
         
         #print(f"無料ゲーム数: {free_count}, 有料ゲーム数: {paid_count}")
@@ -60,16 +62,15 @@ def plot_price_pie(df):
             axes[0].set_title(f"全ゲーム：無料 vs 有料 (総数: {total_count})")
 
             # 右側の円グラフ: 有料ゲームの価格帯分布
-            paid_df = df[df["price_jpy"] > 0].copy()
+            prices = df["price_converted"].to_numpy()
+            paid_prices = prices[prices > 0]
             
-            if len(paid_df) > 0:
-                bins = [0, 500, 1000, 2000, 4000, 8000, float('inf')]
-                labels = ["〜500円", "501〜1000円", "1001〜2000円", 
-                         "2001〜4000円", "4001〜8000円", "8001円〜"]
+            if len(paid_prices) > 0:
+                bins = PRICE_BANDS[currency]["bins"] + [float('inf')]
+                labels = PRICE_BANDS[currency]["labels"]
                 
-                paid_df["price_bin"] = pd.cut(paid_df["price_jpy"], bins=bins, 
-                                            labels=labels, right=True)
-                price_counts = paid_df["price_bin"].value_counts().sort_index()
+                # (a, b] 区間で件数を数える（pd.cut と同じ区切り）
+                price_counts = pd.Series(bin_counts(paid_prices, bins, right=True), index=labels)
                 
                 # 0でない値のみをプロット
                 price_counts = price_counts[price_counts > 0]
@@ -86,7 +87,7 @@ def plot_price_pie(df):
                         counterclock=False, 
                         colors=colors[:len(price_counts)]
                     )
-                    axes[1].set_title(f"有料ゲーム：価格帯分布 (総数: {len(paid_df)})")
+                    axes[1].set_title(f"有料ゲーム：価格帯分布（{currency}） (総数: {len(paid_prices)})")
                 else:
                     axes[1].text(0.5, 0.5, "価格帯データなし", 
                                ha='center', va='center', transform=axes[1].transAxes)